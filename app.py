@@ -1,15 +1,18 @@
 import streamlit as st
-import json
+import orjson
 import os
+import hashlib
+import tempfile
 from pathlib import Path
 from docx import Document
-import io
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Import our custom modules
 from document_processor import DocumentProcessor
 from rag_engine import RAGEngine
-from compliance_checker import ComplianceChecker
+from compliance_checker import ComplianceChecker, Issue
 from doc_editor import DocumentEditor
 
 # Page configuration
@@ -24,10 +27,19 @@ if 'processed_docs' not in st.session_state:
     st.session_state.processed_docs = []
 if 'compliance_report' not in st.session_state:
     st.session_state.compliance_report = None
+if 'issues_by_doc' not in st.session_state:
+    st.session_state.issues_by_doc = {}
+if 'reviewed_docs' not in st.session_state:
+    st.session_state.reviewed_docs = []
+if 'json_report' not in st.session_state:
+    st.session_state.json_report = None
 
 # Load checklist
-with open('checklist.json', 'r') as f:
-    CHECKLIST = json.load(f)
+@st.cache_data
+def load_checklist(path: str = 'checklist.json') -> Dict[str, Any]:
+    return orjson.loads(Path(path).read_bytes())
+
+CHECKLIST = load_checklist()
 
 # Initialize components
 @st.cache_resource
@@ -41,6 +53,77 @@ def init_components():
 
 components = init_components()
 
+@st.cache_data(show_spinner=False, max_entries=100, ttl=3600)
+def parse_document(filename: str, content_hash: str, _file) -> Dict[str, Any]:
+    """Parse an uploaded document from a temp file, memoized on its name and content hash"""
+    with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as tmp:
+        tmp.write(_file.getbuffer())
+    try:
+        return components['processor'].process_document(tmp.name, filename=filename)
+    finally:
+        os.unlink(tmp.name)
+
+def build_reviewed_document(doc: Dict[str, Any], issues: List[Issue]) -> bytes:
+    """Serialize the reviewed document for one uploaded file"""
+    reviewed_doc = components['editor'].create_reviewed_document(doc, issues)
+    return components['editor'].save_document(reviewed_doc, doc['filename'])
+
+def write_json_report(report: Dict[str, Any], batch_size: int = 1000) -> bytes:
+    """Serialize the report through an on-disk temp file, writing issues in batches"""
+    with tempfile.TemporaryFile() as tmp:
+        tmp.write(b'{\n')
+        for n, (key, value) in enumerate(report.items()):
+            if n:
+                tmp.write(b',\n')
+            tmp.write(b'  ' + orjson.dumps(key) + b': ')
+            if key != 'issues':
+                tmp.write(orjson.dumps(value))
+                continue
+            tmp.write(b'[')
+            for start in range(0, len(value), batch_size):
+                if start:
+                    tmp.write(b',')
+                tmp.write(b','.join(b'\n    ' + orjson.dumps(issue) for issue in value[start:start + batch_size]))
+            tmp.write(b'\n  ]' if value else b']')
+        tmp.write(b'\n}\n')
+        # st.download_button keeps the payload as bytes, so hand it exactly one copy
+        tmp.seek(0)
+        return tmp.read()
+
+def prepare_downloads(report: Dict[str, Any]):
+    """Group issues and build every download once per review, storing them in session state"""
+    issues_by_doc = {}
+    for issue in report['issues']:
+        issues_by_doc.setdefault(issue.document, []).append(issue)
+    
+    reviewed_docs = []
+    for doc in report['uploaded_documents']:
+        reviewed_docs.append((doc['filename'], build_reviewed_document(doc, issues_by_doc.get(doc['filename'], []))))
+    
+    st.session_state.issues_by_doc = issues_by_doc
+    st.session_state.reviewed_docs = reviewed_docs
+    st.session_state.json_report = write_json_report(report)
+
+@st.fragment
+def render_downloads():
+    """Render the download buttons from the prebuilt session state"""
+    # Download reviewed documents
+    for filename, reviewed_bytes in st.session_state.reviewed_docs:
+        st.download_button(
+            label=f"Download {filename} (Reviewed)",
+            data=reviewed_bytes,
+            file_name=f"reviewed_{filename}",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+    
+    # Download JSON report
+    st.download_button(
+        label="Download JSON Report",
+        data=st.session_state.json_report,
+        file_name="compliance_report.json",
+        mime="application/json"
+    )
+
 # Main UI
 st.title("🏛️ ADGM Corporate Document Review Agent")
 st.markdown("AI-powered compliance checker for ADGM corporate documents")
@@ -66,11 +149,24 @@ with st.sidebar:
     if st.button("🔍 Start Review", type="primary"):
         if uploaded_files:
             with st.spinner("Processing documents..."):
-                # Process documents
-                st.session_state.processed_docs = []
+                # Deduplicate uploads by content, keeping the first occurrence
+                unique_files = {}
                 for file in uploaded_files:
-                    doc = components['processor'].process_document(file)
-                    st.session_state.processed_docs.append(doc)
+                    unique_files.setdefault(hashlib.sha256(file.getbuffer()).hexdigest(), file)
+                
+                # Parse in parallel; content seen before is served from parse_document's cache,
+                # which the workers can reach once they carry the script context
+                with ThreadPoolExecutor(
+                    max_workers=min(8, len(unique_files)),
+                    initializer=add_script_run_ctx,
+                    initargs=(None, get_script_run_ctx())
+                ) as executor:
+                    st.session_state.processed_docs = list(executor.map(
+                        parse_document,
+                        [file.name for file in unique_files.values()],
+                        list(unique_files),
+                        list(unique_files.values())
+                    ))
                 
                 # Generate compliance report
                 st.session_state.compliance_report = components['checker'].generate_report(
@@ -78,6 +174,7 @@ with st.sidebar:
                     process_type,
                     CHECKLIST[process_type]
                 )
+                prepare_downloads(st.session_state.compliance_report)
                 
                 st.success("Review completed!")
 
@@ -110,52 +207,28 @@ if st.session_state.compliance_report:
         checklist = CHECKLIST[process_type]
         
         # Display checklist with status
+        uploaded_set = set(report['uploaded_document_types'])
         for doc in checklist['required_documents']:
-            status = "✅ Uploaded" if doc in [d['type'] for d in report['uploaded_documents']] else "❌ Missing"
+            status = "✅ Uploaded" if doc in uploaded_set else "❌ Missing"
             st.write(f"{status} - {doc}")
     
     with tab3:
         st.header("Compliance Issues")
         
-        if report['issues']:
-            for issue in report['issues']:
-                with st.expander(f"{issue['document']} - {issue['section']}"):
-                    st.write(f"**Issue:** {issue['description']}")
-                    st.write(f"**Severity:** {issue['severity']}")
-                    st.write(f"**Suggestion:** {issue['suggestion']}")
-                    st.write(f"**ADGM Reference:** {issue['reference']}")
+        if st.session_state.issues_by_doc:
+            for doc_issues in st.session_state.issues_by_doc.values():
+                for issue in doc_issues:
+                    with st.expander(f"{issue.document} - {issue.section}"):
+                        st.write(f"**Issue:** {issue.description}")
+                        st.write(f"**Severity:** {issue.severity}")
+                        st.write(f"**Suggestion:** {issue.suggestion}")
+                        st.write(f"**ADGM Reference:** {issue.reference}")
         else:
             st.success("No compliance issues found!")
     
     with tab4:
         st.header("Download Results")
-        
-        # Download reviewed documents
-        for doc in report['uploaded_documents']:
-            reviewed_doc = components['editor'].create_reviewed_document(
-                doc,
-                [i for i in report['issues'] if i['document'] == doc['filename']]
-            )
-            
-            buffer = io.BytesIO()
-            reviewed_doc.save(buffer)
-            buffer.seek(0)
-            
-            st.download_button(
-                label=f"Download {doc['filename']} (Reviewed)",
-                data=buffer,
-                file_name=f"reviewed_{doc['filename']}",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            )
-        
-        # Download JSON report
-        json_report = json.dumps(report, indent=2)
-        st.download_button(
-            label="Download JSON Report",
-            data=json_report,
-            file_name="compliance_report.json",
-            mime="application/json"
-        )
+        render_downloads()
 
 else:
     st.info("👋 Upload documents and click 'Start Review' to begin the compliance check.")
@@ -3,6 +3,7 @@ from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.shared import OxmlElement, qn
 from typing import List, Dict, Any
+from compliance_checker import Issue
 import io
 
 class DocumentEditor:
@@ -11,7 +12,7 @@ class DocumentEditor:
     def __init__(self):
         pass
     
-    def create_reviewed_document(self, original_doc: Dict[str, Any], issues: List[Dict[str, Any]]) -> Document:
+    def create_reviewed_document(self, original_doc: Dict[str, Any], issues: List[Issue]) -> Document:
         """Create a reviewed document with compliance feedback."""
         
         # Create new document
@@ -37,24 +38,24 @@ class DocumentEditor:
             doc.add_heading('Compliance Issues Found', level=1)
             
             for i, issue in enumerate(issues, 1):
-                doc.add_heading(f"Issue {i}: {issue.get('section', 'General')}", level=2)
+                doc.add_heading(f"Issue {i}: {issue.section}", level=2)
                 
                 # Issue details
                 p = doc.add_paragraph()
                 p.add_run("Description: ").bold = True
-                p.add_run(issue.get('description', 'No description provided'))
+                p.add_run(issue.description)
                 
                 p = doc.add_paragraph()
                 p.add_run("Severity: ").bold = True
-                p.add_run(issue.get('severity', 'Unknown'))
+                p.add_run(issue.severity)
                 
                 p = doc.add_paragraph()
                 p.add_run("Suggestion: ").bold = True
-                p.add_run(issue.get('suggestion', 'No suggestion provided'))
+                p.add_run(issue.suggestion)
                 
                 p = doc.add_paragraph()
                 p.add_run("ADGM Reference: ").bold = True
-                p.add_run(issue.get('reference', 'Not specified'))
+                p.add_run(issue.reference)
                 
                 doc.add_paragraph()  # Add spacing
         else:
@@ -79,7 +80,7 @@ class DocumentEditor:
         
         return doc
     
-    def add_compliance_notes(self, doc: Document, issues: List[Dict[str, Any]]) -> Document:
+    def add_compliance_notes(self, doc: Document, issues: List[Issue]) -> Document:
         """Add compliance notes to an existing document."""
         
         # Add page break
@@ -92,7 +93,7 @@ class DocumentEditor:
             doc.add_paragraph("The following compliance issues were identified:")
             
             for issue in issues:
-                doc.add_heading(f"Issue: {issue.get('section', 'General')}", level=2)
+                doc.add_heading(f"Issue: {issue.section}", level=2)
                 
                 # Create table for issue details
                 table = doc.add_table(rows=4, cols=2)
@@ -100,16 +101,16 @@ class DocumentEditor:
                 
                 # Fill table
                 table.cell(0, 0).text = "Description"
-                table.cell(0, 1).text = issue.get('description', '')
+                table.cell(0, 1).text = issue.description
                 
                 table.cell(1, 0).text = "Severity"
-                table.cell(1, 1).text = issue.get('severity', '')
+                table.cell(1, 1).text = issue.severity
                 
                 table.cell(2, 0).text = "Suggestion"
-                table.cell(2, 1).text = issue.get('suggestion', '')
+                table.cell(2, 1).text = issue.suggestion
                 
                 table.cell(3, 0).text = "Reference"
-                table.cell(3, 1).text = issue.get('reference', '')
+                table.cell(3, 1).text = issue.reference
                 
                 doc.add_paragraph()
         else:
@@ -164,7 +165,7 @@ class DocumentEditor:
             # Group by severity
             severity_counts = {}
             for issue in issues:
-                severity = issue.get('severity', 'Unknown')
+                severity = issue.severity
                 severity_counts[severity] = severity_counts.get(severity, 0) + 1
             
             for severity, count in severity_counts.items():
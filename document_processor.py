@@ -1,7 +1,10 @@
+import os
 import docx
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import re
-from fuzzywuzzy import fuzz
+import zipfile
+import ahocorasick
+from rapidfuzz import fuzz, process
 import io
 
 class DocumentProcessor:
@@ -16,47 +19,67 @@ class DocumentProcessor:
             'UBO Form': ['ubo', 'ultimate beneficial owner', 'beneficial owner'],
             'Certificate of Incorporation': ['certificate of incorporation', 'incorporation certificate']
         }
+        
+        # Single automaton over all keywords; values carry the type's priority order
+        self._type_automaton = ahocorasick.Automaton()
+        for priority, (doc_type, keywords) in enumerate(self.document_types.items()):
+            for keyword in keywords:
+                self._type_automaton.add_word(keyword, (priority, doc_type))
+        self._type_automaton.make_automaton()
+        
+        # Flattened keyword list for a single fuzzy-matching pass
+        self._all_keywords = [(keyword, doc_type) for doc_type, keywords in self.document_types.items() for keyword in keywords]
+        self._keyword_strings = [keyword for keyword, _ in self._all_keywords]
+        
+        self._section_num_re = re.compile(r'^\d+\.')
     
-    def process_document(self, file) -> Dict[str, Any]:
-        """Process a single document and extract key information"""
+    def process_document(self, file_or_path, filename: str = None) -> Dict[str, Any]:
+        """Process a single document (path or file object) and extract key information"""
+        if filename is None:
+            filename = getattr(file_or_path, 'name', None) or os.path.basename(file_or_path)
         try:
-            doc = docx.Document(file)
-            full_text = self._extract_text(doc)
+            # Report a bad upload as such, not as python-docx's "Package not found at <temp path>"
+            if not zipfile.is_zipfile(file_or_path):
+                raise zipfile.BadZipFile('File is not a zip file')
+            doc = docx.Document(file_or_path)
+            full_text, paragraphs, word_count = self._extract_text(doc)
+            content_lower = full_text.lower()
             
             return {
-                'filename': file.name,
-                'type': self._identify_document_type(file.name, full_text),
+                'filename': filename,
+                'type': self._identify_document_type(filename, content_lower),
                 'content': full_text,
-                'paragraphs': [p.text for p in doc.paragraphs if p.text.strip()],
+                'paragraphs': paragraphs,
                 'tables': self._extract_tables(doc),
-                'word_count': len(full_text.split()),
+                'word_count': word_count,
                 'metadata': {
                     'core_properties': self._get_core_properties(doc),
                     'sections': self._identify_sections(full_text)
                 }
             }
         except Exception as e:
-            return {'error': str(e), 'filename': file.name}
+            return {'error': str(e), 'filename': filename}
     
-    def _extract_text(self, doc: docx.Document) -> str:
-        """Extract all text from document"""
-        return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+    def _extract_text(self, doc: docx.Document) -> Tuple[str, List[str], int]:
+        """Extract full text, non-empty paragraphs and word count in a single pass over the paragraphs"""
+        paragraph_texts = [paragraph.text for paragraph in doc.paragraphs]
+        paragraphs = [text for text in paragraph_texts if text.strip()]
+        word_count = sum(len(text.split()) for text in paragraphs)
+        return '\n'.join(paragraph_texts), paragraphs, word_count
     
-    def _identify_document_type(self, filename: str, content: str) -> str:
-        """Identify the type of document based on filename and content"""
+    def _identify_document_type(self, filename: str, content_lower: str) -> str:
+        """Identify the type of document based on filename and lower-cased content"""
         filename_lower = filename.lower()
-        content_lower = content.lower()
         
-        for doc_type, keywords in self.document_types.items():
-            for keyword in keywords:
-                if keyword in filename_lower or keyword in content_lower:
-                    return doc_type
+        matches = [match for _, match in self._type_automaton.iter(filename_lower)]
+        matches.extend(match for _, match in self._type_automaton.iter(content_lower))
+        if matches:
+            return min(matches)[1]
         
         # Use fuzzy matching for better accuracy
-        for doc_type, keywords in self.document_types.items():
-            for keyword in keywords:
-                if fuzz.partial_ratio(keyword, content_lower) > 80:
-                    return doc_type
+        match = process.extractOne(content_lower, self._keyword_strings, scorer=fuzz.partial_ratio, score_cutoff=80)
+        if match:
+            return self._all_keywords[match[2]][1]
         
         return "Unknown Document Type"
     
@@ -71,14 +94,15 @@ class DocumentProcessor:
             tables.append(table_data)
         return tables
     
-    def _get_core_properties(self, doc: docx.Document) -> Dict[str, str]:
+    def _get_core_properties(self, doc: docx.Document) -> Dict[str, Any]:
         """Get document properties"""
         props = {}
         if doc.core_properties:
             props['title'] = doc.core_properties.title or ''
             props['author'] = doc.core_properties.author or ''
-            props['created'] = str(doc.core_properties.created) if doc.core_properties.created else ''
-            props['modified'] = str(doc.core_properties.modified) if doc.core_properties.modified else ''
+            # datetimes are passed through; orjson serializes them natively
+            props['created'] = doc.core_properties.created or ''
+            props['modified'] = doc.core_properties.modified or ''
         return props
     
     def _identify_sections(self, content: str) -> List[str]:
@@ -88,7 +112,7 @@ class DocumentProcessor:
         
         for line in lines:
             line = line.strip()
-            if line and (line.isupper() or line.endswith(':') or re.match(r'^\d+\.', line)):
+            if line and (line.isupper() or line.endswith(':') or self._section_num_re.match(line)):
                 sections.append(line)
         
         return sections[:10]  # Return first 10 sections
@@ -99,14 +123,25 @@ class DocumentProcessor:
         content_lower = content.lower()
         
         for clause_type in clause_types:
-            # Look for clause patterns
-            pattern = rf"{clause_type.lower()}.*?(?=\n\n|\n[A-Z]|$)"
-            matches = re.findall(pattern, content_lower, re.DOTALL)
-            if matches:
-                clauses[clause_type] = matches[0].strip()
+            # Clause runs from its first mention to the next blank line or capitalised line
+            keyword = clause_type.lower()
+            start = content_lower.find(keyword)
+            if start != -1:
+                end = self._find_clause_end(content_lower, start + len(keyword))
+                clauses[clause_type] = content_lower[start:end].strip()
         
         return clauses
     
+    def _find_clause_end(self, content: str, pos: int) -> int:
+        """Return the index of the first newline from pos followed by a newline or capital letter"""
+        newline = content.find('\n', pos)
+        while newline != -1:
+            following = content[newline + 1:newline + 2]
+            if following == '\n' or 'A' <= following <= 'Z':
+                return newline
+            newline = content.find('\n', newline + 1)
+        return len(content)
+    
     def validate_document_completeness(self, doc_info: Dict[str, Any], required_elements: List[str]) -> Dict[str, Any]:
         """Check if document contains all required elements"""
         content = doc_info['content'].lower()
@@ -1,7 +1,31 @@
 import os
-import json
-from typing import List, Dict, Any
+import gzip
+import orjson
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple
 import logging
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+# Stateless term counter, so shards can be counted independently and stacked
+HASHER = HashingVectorizer(lowercase=True, stop_words='english', alternate_sign=False, norm=None)
+
+def _count_terms(documents: List[Dict[str, Any]]) -> sp.csr_matrix:
+    """Hashed term counts, one row per document"""
+    return HASHER.transform([
+        doc.get('content', '') if isinstance(doc, dict) and isinstance(doc.get('content'), str) else ''
+        for doc in documents
+    ])
+
+def _load_shard(path: str) -> Tuple[List[Dict[str, Any]], sp.csr_matrix]:
+    """Load and count one JSONL shard (optionally gzipped) of knowledge base documents"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        documents = [orjson.loads(line) for line in f if line.strip()]
+    return documents, _count_terms(documents)
 
 class RAGEngine:
     """RAG Engine for ADGM Corporate Document Processing"""
@@ -11,71 +35,111 @@ class RAGEngine:
         Initialize RAG Engine
         
         Args:
-            filename: Path to the knowledge base file (JSON or text)
+            filename: Path to the knowledge base file (JSON or text) or a directory of JSONL shards
         """
         self.filename = filename
         self.documents = []
+        self.tfidf = None
+        self.matrix = None
+        self._counts = None
+        self._matrix_stale = True
         
         # Load knowledge base if filename provided
         if filename and os.path.exists(filename):
             self.load_knowledge_base(filename)
     
     def load_knowledge_base(self, filename: str):
-        """Load knowledge base from file"""
+        """Load knowledge base from file or shard directory"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                if filename.endswith('.json'):
-                    data = json.load(f)
-                    if isinstance(data, dict):
-                        # Handle nested structure
-                        for key, value in data.items():
-                            if isinstance(value, list):
-                                self.documents.extend(value)
-                            else:
-                                self.documents.append(value)
+            if os.path.isdir(filename):
+                self.documents, self._counts = self._load_shards(filename)
+            else:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    if filename.endswith('.json'):
+                        data = orjson.loads(f.read())
+                        if isinstance(data, dict):
+                            # Handle nested structure
+                            for key, value in data.items():
+                                if isinstance(value, list):
+                                    self.documents.extend(value)
+                                else:
+                                    self.documents.append(value)
+                        else:
+                            self.documents = data if isinstance(data, list) else [data]
                     else:
-                        self.documents = data if isinstance(data, list) else [data]
-                else:
-                    # Handle text files
-                    content = f.read()
-                    self.documents = [{"content": content, "source": filename}]
+                        # Handle text files
+                        content = f.read()
+                        self.documents = [{"content": content, "source": filename}]
+                self._counts = _count_terms(self.documents)
         except Exception as e:
             logging.warning(f"Error loading knowledge base: {e}")
             self.documents = []
+            self._counts = None
+        
+        self._fit_tfidf()
+    
+    def _load_shards(self, directory: str) -> Tuple[List[Dict[str, Any]], sp.csr_matrix]:
+        """Load and count all *.jsonl / *.jsonl.gz shards in a directory, in parallel across processes"""
+        paths = sorted(str(p) for p in Path(directory).iterdir() if p.name.endswith(('.jsonl', '.jsonl.gz')))
+        if not paths:
+            return [], None
+        if len(paths) == 1:
+            shards = [_load_shard(paths[0])]
+        else:
+            # spawn, not fork: this may run inside the multithreaded Streamlit server
+            with ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, len(paths)),
+                mp_context=multiprocessing.get_context('spawn')
+            ) as executor:
+                shards = list(executor.map(_load_shard, paths))
+        documents = [doc for shard_docs, _ in shards for doc in shard_docs]
+        return documents, sp.vstack([counts for _, counts in shards], format='csr')
+    
+    def _fit_tfidf(self):
+        """Fit IDF weights over the merged term counts and build the document matrix"""
+        if self._counts is None or self._counts.shape[0] == 0:
+            self.tfidf = None
+            self.matrix = None
+        else:
+            self.tfidf = TfidfTransformer()
+            self.matrix = self.tfidf.fit_transform(self._counts)
+        self._matrix_stale = False
     
     def add_document(self, content: str, metadata: Dict[str, Any] = None):
         """Add a document to the knowledge base"""
         doc = {"content": content, "metadata": metadata or {}}
         self.documents.append(doc)
+        counts = _count_terms([doc])
+        self._counts = counts if self._counts is None else sp.vstack([self._counts, counts], format='csr')
+        self._matrix_stale = True
         return len(self.documents) - 1
     
     def query(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
-        """Query the knowledge base using basic text matching"""
-        results = []
-        query_lower = query.lower()
+        """Query the knowledge base ranked by TF-IDF cosine similarity"""
+        if self._matrix_stale:
+            self._fit_tfidf()
+        if self.matrix is None or n_results <= 0:
+            return []
         
-        for doc in self.documents:
-            content = doc.get('content', '')
-            if isinstance(content, str):
-                # Simple keyword matching
-                score = 0
-                query_words = query_lower.split()
-                content_lower = content.lower()
-                
-                for word in query_words:
-                    if word in content_lower:
-                        score += 1
-                
-                if score > 0:
-                    results.append({
-                        'content': content,
-                        'metadata': doc.get('metadata', {}),
-                        'score': score / len(query_words) if query_words else 0
-                    })
+        q = self.tfidf.transform(HASHER.transform([query]))
+        scores = (self.matrix @ q.T).toarray().ravel()
+        
+        # Partial selection of the top candidates, then sort just those
+        if n_results < len(scores):
+            top = np.argpartition(-scores, n_results)[:n_results]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
         
-        # Sort by relevance score
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:n_results]
+        return [
+            {
+                'content': self.documents[doc_idx].get('content', ''),
+                'metadata': self.documents[doc_idx].get('metadata', {}),
+                'score': float(scores[doc_idx])
+            }
+            for doc_idx in top
+            if scores[doc_idx] > 0
+        ]
     
     def get_relevant_context(self, query: str, max_tokens: int = 1000) -> str:
         """Get relevant context for a query"""